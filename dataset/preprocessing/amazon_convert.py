@@ -22,7 +22,12 @@ for WORKLOAD in ["D", "E"]:
     worker_files = [open(f"{output_dir}/Workload{WORKLOAD}/workload_{WORKLOAD}_worker_{i}", "w") for i in range(NUM_THREADS)]
 
     key_buffer = list() # Used for workload D
-    inserted_keys = list() # Used for workload E
+    inserted_keys = bytearray() # Used for workload E, one key every KEY_LENGTH bytes (NUL padded)
+
+    # Keys must be ASCII, so that each one fits its KEY_LENGTH slot (raises UnicodeEncodeError otherwise)
+    def insert_key(key):
+        inserted_keys.extend(key.encode("ascii").ljust(KEY_LENGTH, b"\0"))
+
     def generate_op(workload, current_key):
         global key_buffer
         if workload == "D":
@@ -41,10 +46,10 @@ for WORKLOAD in ["D", "E"]:
         elif workload == "E":
             random_num = random.random()
             if random_num < 0.9:
-                random_int = random.randrange(0, len(inserted_keys))
-                return "s", inserted_keys[random_int]
+                start = random.randrange(0, len(inserted_keys) // KEY_LENGTH) * KEY_LENGTH
+                return "s", inserted_keys[start:start + KEY_LENGTH].rstrip(b"\0").decode("ascii")
             else:
-                inserted_keys.append(current_key)
+                insert_key(current_key)
                 return "i", current_key
 
 
@@ -57,6 +62,7 @@ for WORKLOAD in ["D", "E"]:
                 splitted = line.split(",")
                 key = splitted[1]
                 key = key + "0" * (KEY_LENGTH - len(key))
+                key = key[1:KEY_LENGTH+1]
 
                 if current_state == "load":
                     counter += 1
@@ -65,8 +71,9 @@ for WORKLOAD in ["D", "E"]:
                         current_state = "thread"
                         current_file.close()
                     else:
-                        inserted_keys.append(key[1:KEY_LENGTH+1])
-                        current_file.write(f"{key[1:KEY_LENGTH+1]}\n")
+                        insert_key(key)
+                        current_file.write(key)
+                        current_file.write("\n")
 
                 elif current_state == "thread":
                     if current_thread == NUM_THREADS:
@@ -75,7 +82,7 @@ for WORKLOAD in ["D", "E"]:
                         if counter == PER_THREAD_KEYS:
                             break
                     op, query_key = generate_op(WORKLOAD, key)
-                    worker_files[current_thread].write(f"{op} {query_key[1:KEY_LENGTH+1]}\n")
+                    worker_files[current_thread].write(f"{op} {query_key}\n")
                     current_thread += 1
 
     for i in range(NUM_THREADS):
@@ -1,5 +1,6 @@
 import sys
-import random
+import numpy as np
+from numba import njit
 
 if len(sys.argv) < 2:
     print(f"Usage: {sys.argv[0]} [output_dir]")
@@ -20,75 +21,170 @@ INIT_KEYS=10_000_000
 PER_THREAD_KEYS=40_000_000
 KEY_LENGTH=128
 
-for WORKLOAD in ["D", "E"]:
-    current_state="load"
-    counter = 0
-    current_thread = 0
-
-    current_file = open(f"{output_dir}/Workload{WORKLOAD}/workload_{WORKLOAD}_load", "w")
-    worker_files = [open(f"{output_dir}/Workload{WORKLOAD}/workload_{WORKLOAD}_worker_{i}", "w") for i in range(NUM_THREADS)]
-
-    key_buffer = list() # Used for workload D
-    inserted_keys = list() # Used for workload E
-
-    def generate_op(workload, current_key):
-        global key_buffer
-        if workload == "D":
-            random_num = random.random()
-            if random_num < 0.9:
-                if len(key_buffer) == 0:
-                    return "r", current_key
-                else:
-                    random_int = random.randrange(0, len(key_buffer))
-                    return "r", key_buffer[random_int]
-            else:
-                if len(key_buffer) == 10:
-                    key_buffer.pop(0)
-                key_buffer.append(current_key)
-                return "i", current_key
-        elif workload == "E":
-            random_num = random.random()
-            if random_num < 0.9:
-                random_int = random.randrange(0, len(inserted_keys))
-                return "s", inserted_keys[random_int]
+BLOCK_SIZE=16 << 20 # Bytes of the input scanned at once (must hold at least one whole line)
+NEWLINE=ord("\n")
+PADDING=ord("/")
+SPACE=ord(" ")
+OP_READ=ord("r")
+OP_INSERT=ord("i")
+OP_SCAN=ord("s")
+OP_LENGTH=KEY_LENGTH + 3 # "<op> <key>\n"
+KEY_BUFFER_SIZE=10 # Latest inserted keys read by workload D
+RESERVOIR_SIZE=1_000_000 # Inserted keys sampled as scan sources by workload E
+
+rng = np.random.default_rng()
+
+# Extract the keys of "L"/"P" lines in a block of whole lines
+# Each key is padded (or cut) to KEY_LENGTH bytes and followed by a newline,
+# so the returned (N, KEY_LENGTH + 1) array can be dumped as is with tofile().
+def extract_keys(block, ends):
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    is_key = (ends - starts) > 2
+    starts, ends = starts[is_key], ends[is_key]
+
+    marker = block[starts]
+    separator = block[starts + 1]
+    is_key = ((marker == ord("L")) | (marker == ord("P"))) & ((separator == ord("\t")) | (separator == ord(" ")))
+    starts, ends = starts[is_key] + 2, ends[is_key]
+    ends -= (block[ends - 1] == ord("\r"))
+
+    lengths = np.minimum(ends - starts, KEY_LENGTH)
+    starts, lengths = starts[lengths > 0], lengths[lengths > 0]
+
+    keys = np.full((len(starts), KEY_LENGTH + 1), PADDING, dtype=np.uint8)
+    keys[:, KEY_LENGTH] = NEWLINE
+    for i in range(KEY_LENGTH):
+        in_key = lengths > i
+        if not in_key.any():
+            break
+        keys[in_key, i] = block[starts[in_key] + i]
+    return keys
+
+# Yield the keys of a memetracker file, one block at a time
+def read_keys(filename):
+    data = np.memmap(filename, dtype=np.uint8, mode="r")
+    begin = 0
+    while begin < len(data):
+        block = data[begin:begin + BLOCK_SIZE]
+        ends = np.flatnonzero(block == NEWLINE)
+        if begin + len(block) < len(data):
+            # Leave the trailing partial line to the next block
+            block = block[:ends[-1] + 1]
+        elif block[-1] != NEWLINE:
+            ends = np.append(ends, len(block))
+        begin += len(block)
+        yield extract_keys(block, ends)
+
+# Add a key to the reservoir of inserted keys of workload E
+# (classical reservoir sampling: the reservoir stays a uniform sample of every inserted key)
+# counts[1] is the number of keys ever inserted and draw is uniform in [0, 1).
+@njit(cache=True)
+def insert_key(inserted_keys, counts, key, draw):
+    if counts[1] < RESERVOIR_SIZE:
+        inserted_keys[counts[1]] = key
+    else:
+        slot = int(draw * (counts[1] + 1))
+        if slot < RESERVOIR_SIZE:
+            inserted_keys[slot] = key
+    counts[1] += 1
+
+@njit(cache=True)
+def insert_keys(keys, draws, inserted_keys, counts):
+    for j in range(len(keys)):
+        insert_key(inserted_keys, counts, keys[j, :KEY_LENGTH], draws[j])
+
+# Generate the ops of both workloads for a block of keys
+# Ops are written as fixed-width "<op> <key>\n" rows into ops_d and ops_e.
+# The state carried across blocks lives in the arrays passed in:
+#   key_buffer: ring of the latest inserted keys of workload D
+#   inserted_keys: reservoir of the keys inserted so far in workload E
+#   counts: [keys ever put in key_buffer, keys ever put in inserted_keys]
+# op_draws/pick_draws hold one row of uniform [0, 1) draws per workload:
+# the first picks the operation and the second the existing key to query
+# (or the reservoir slot of an inserted key).
+@njit(cache=True)
+def generate_ops(keys, op_draws, pick_draws, key_buffer, inserted_keys, counts, ops_d, ops_e):
+    for j in range(len(keys)):
+        key = keys[j, :KEY_LENGTH]
+
+        # Workload D: 90% reads of the latest inserted keys, 10% inserts
+        ops_d[j, 1] = SPACE
+        ops_d[j, OP_LENGTH - 1] = NEWLINE
+        if op_draws[0, j] < 0.9:
+            ops_d[j, 0] = OP_READ
+            size = min(counts[0], KEY_BUFFER_SIZE)
+            if size == 0:
+                ops_d[j, 2:OP_LENGTH - 1] = key
             else:
-                inserted_keys.append(current_key)
-                return "i", current_key
-
-    for filename in file_list:
-        with open(filename, "r") as f:
-            while True:
-                line = f.readline()
-                if not line:
-                    break
-                else:
-                    line = line.split()
-                    if len(line) < 2:
-                        continue
-                    if (line[0] != "L") and (line[0] != "P"):
-                        continue
-                    key = line[1]
-                    key = key + "/" * (KEY_LENGTH - len(key))
-
-                    if current_state == "load":
-                        counter += 1
-                        if counter == INIT_KEYS + 1:
-                            counter = 0
-                            current_state = "thread"
-                            current_file.close()
-                        else:
-                            inserted_keys.append(key[:])
-                            current_file.write(f"{key[:]}\n")
-
-                    elif current_state == "thread":
-                        if current_thread == NUM_THREADS:
-                            current_thread = 0
-                            counter += 1
-                            if counter >= PER_THREAD_KEYS - 1:
-                                break
-                        op, query_key = generate_op(WORKLOAD, key)
-                        worker_files[current_thread].write(f"{op} {query_key[:]}\n")
-                        current_thread += 1
+                ops_d[j, 2:OP_LENGTH - 1] = key_buffer[int(pick_draws[0, j] * size)]
+        else:
+            ops_d[j, 0] = OP_INSERT
+            key_buffer[counts[0] % KEY_BUFFER_SIZE] = key
+            counts[0] += 1
+            ops_d[j, 2:OP_LENGTH - 1] = key
+
+        # Workload E: 90% scans from an inserted key, 10% inserts
+        ops_e[j, 1] = SPACE
+        ops_e[j, OP_LENGTH - 1] = NEWLINE
+        if op_draws[1, j] < 0.9:
+            ops_e[j, 0] = OP_SCAN
+            ops_e[j, 2:OP_LENGTH - 1] = inserted_keys[int(pick_draws[1, j] * min(counts[1], RESERVOIR_SIZE))]
+        else:
+            ops_e[j, 0] = OP_INSERT
+            insert_key(inserted_keys, counts, key, pick_draws[1, j])
+            ops_e[j, 2:OP_LENGTH - 1] = key
+
+WORKLOAD_LIST = ("D", "E")
+TOTAL_OPS = NUM_THREADS * (PER_THREAD_KEYS - 1) # Ops over all workers, after the load keys
+
+# Both workloads are generated in a single pass over the input files
+load_files = {workload: open(f"{output_dir}/Workload{workload}/workload_{workload}_load", "wb") for workload in WORKLOAD_LIST}
+worker_files = {workload: [open(f"{output_dir}/Workload{workload}/workload_{workload}_worker_{i}", "wb") for i in range(NUM_THREADS)]
+                for workload in WORKLOAD_LIST}
+
+current_state="load"
+counter = 0
+
+key_buffer = np.zeros((KEY_BUFFER_SIZE, KEY_LENGTH), dtype=np.uint8) # Used for workload D
+inserted_keys = np.zeros((RESERVOIR_SIZE, KEY_LENGTH), dtype=np.uint8) # Used for workload E
+counts = np.zeros(2, dtype=np.int64)
+
+for filename in file_list:
+    for keys in read_keys(filename):
+        if current_state == "load":
+            load_keys = keys[:INIT_KEYS - counter]
+            for workload in WORKLOAD_LIST:
+                load_keys.tofile(load_files[workload])
+            insert_keys(load_keys, rng.random(len(load_keys)), inserted_keys, counts)
+            counter += len(load_keys)
+            keys = keys[len(load_keys):]
+            if counter == INIT_KEYS and len(keys) > 0:
+                # The key right after the load keys is skipped
+                keys = keys[1:]
+                counter = 0
+                current_state = "thread"
+                for workload in WORKLOAD_LIST:
+                    load_files[workload].close()
+
+        if current_state == "thread":
+            keys = keys[:TOTAL_OPS - counter]
+            ops = {workload: np.empty((len(keys), OP_LENGTH), dtype=np.uint8) for workload in WORKLOAD_LIST}
+            generate_ops(keys, rng.random((2, len(keys))), rng.random((2, len(keys))),
+                         key_buffer, inserted_keys, counts, ops["D"], ops["E"])
+
+            # Ops are dealt to the workers in round-robin order
+            for workload in WORKLOAD_LIST:
+                for i in range(NUM_THREADS):
+                    ops[workload][(i - counter) % NUM_THREADS::NUM_THREADS].tofile(worker_files[workload][i])
+            counter += len(keys)
+            if counter == TOTAL_OPS:
+                current_state = "done"
+
+        if current_state == "done":
+            break
+    if current_state == "done":
+        break
 
+for workload in WORKLOAD_LIST:
     for i in range(NUM_THREADS):
-        worker_files[i].close()
\ No newline at end of file
+        worker_files[workload][i].close()
\ No newline at end of file
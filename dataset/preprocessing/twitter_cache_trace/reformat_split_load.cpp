@@ -0,0 +1,163 @@
+#include <iostream>
+#include <fstream>
+#include <set>
+#include <string>
+#include <vector>
+
+#define COUT_THIS(this) std::cout << this << std::endl;
+
+/*
+ Reformat, make load trace and split workload trace in a single pass
+
+ Does the work of reformat, make_load_trace and split_workload_trace
+ without writing the reformatted trace to an intermediate file.
+ - Each Twitter trace line is reformatted to YCSB trace form (see reformat.cpp)
+ - Unique keys of the first (table size) lines go to the load trace
+   ({output path}/{cluster}/load{cluster}, see make_load_trace.cpp)
+ - Every reformatted line is dealt to the worker traces in round-robin order
+   ({output path}/{cluster}/workload_XX, see split_workload_trace.cpp)
+*/
+
+bool isNumber(const std::string& str)
+{
+    for (char const &c: str) {
+        if (!std::isdigit(c)) return false;
+    }
+    return true;
+}
+
+// argv[1]: input filename
+// argv[2]: output path
+// argv[3]: cluster number
+// argv[4]: table size (# of lines the load trace is made from)
+// argv[5]: number of threads
+
+int main(int argc, char **argv)
+{
+    if (argc < 6) {
+        std::cout << "Usage: " << argv[0] << " [input_filename] [output_path] [cluster_number] [table_size] [num_threads]" << std::endl;
+        return 1;
+    }
+
+    std::string filename = argv[1];
+    std::string outputpath = std::string(argv[2]) + "/" + argv[3];
+    size_t table_size = atol(argv[4]);
+    int num_workers = atoi(argv[5]);
+
+    std::ifstream trace_file(filename);
+    if (trace_file.fail())
+    {
+        std::cout << filename << " does not exist." << std::endl;
+        return 1;
+    }
+
+    // Open load trace and worker trace files
+    std::string load_trace_filename = outputpath + "/load" + argv[3];
+    std::ofstream load_trace_file(load_trace_filename);
+    if (!load_trace_file.is_open())
+    {
+        std::cout << "Cannot open " << load_trace_filename << std::endl;
+        return 1;
+    }
+    COUT_THIS("Open " << load_trace_filename);
+
+    std::vector<std::ofstream> files(num_workers);
+    std::vector<std::string> split_filenames(num_workers);
+    char split_filename[300];
+    for (int i = 0; i < num_workers; i++) {
+        sprintf(split_filename, "%s/workload_%02d", outputpath.c_str(), i);
+        split_filenames[i] = split_filename;
+        files[i].open(split_filename);
+        if (!files[i].is_open())
+        {
+            std::cout << "Cannot open " << split_filename << std::endl;
+            return 1;
+        }
+        COUT_THIS("Open " << split_filename);
+    }
+
+    std::set<std::string> key_set;
+    size_t load_keys = 0;
+    size_t linecount = 0;
+    std::string trace_line;
+
+    while (getline(trace_file, trace_line))
+    {
+        char ops = 0;
+        std::string key;
+        size_t idx = 0;
+        size_t pos = 0;
+        std::string token;
+        std::string delimiter = ",";
+        std::string line = trace_line;
+
+        // Parse the line and Extract key and operaion type from it
+        while((pos = trace_line.find(delimiter)) != std::string::npos)
+        {
+            token = trace_line.substr(0, pos);
+            trace_line.erase(0, pos + delimiter.length());
+
+            if (idx == 1) // key
+                key = token;
+            if (idx == 2 && !isNumber(token)) {
+                key.append("," + token);
+                continue;
+            }
+            if (idx == 5) { // operation
+                if (!token.compare("get") || !token.compare("gets")) {
+                    ops = 'g';
+                } else if (!token.compare("set") || !token.compare("replace") || !token.compare("cas") || !token.compare("add") || !token.compare("append") || !token.compare("prepend") || !token.compare("incr") || !token.compare("decr")) {
+                    ops = 'p';
+                } else if (!token.compare("delete")) {
+                    ops = 'd';
+                } else {
+                    std::cout << "Strange operation.. (operation:" << token << ")" << std::endl;
+                    std::cout << "current line:" <<std::endl << line << std::endl;
+                    std::cout << "key: " << key << std::endl;
+                    return 1;
+                }
+            }
+            idx++;
+        }
+        if (ops == 0) {
+            std::cout << "Missing operation.." << std::endl;
+            std::cout << "current line:" <<std::endl << line << std::endl;
+            return 1;
+        }
+
+        // Load trace contains only the unique keys of the first lines
+        // (cut at the first whitespace, as make_load_trace reads them with %s)
+        if (linecount < table_size) {
+            std::string load_key = key.substr(0, key.find_first_of(" \t\r\n"));
+            if (key_set.insert(load_key).second) {
+                load_trace_file << load_key << "\n";
+                load_keys++;
+            }
+        }
+
+        files[linecount % num_workers] << ops << " " << key << "\n";
+        linecount++;
+    }
+
+    // Check for write errors before closing, as close() does not report them
+    load_trace_file.flush();
+    if (!load_trace_file.good())
+    {
+        std::cout << "Failed to write " << load_trace_filename << std::endl;
+        return 1;
+    }
+    load_trace_file.close();
+    for (int i = 0; i < num_workers; i++) {
+        files[i].flush();
+        if (!files[i].good())
+        {
+            std::cout << "Failed to write " << split_filenames[i] << std::endl;
+            return 1;
+        }
+        files[i].close();
+    }
+
+    printf("Successfully made load trace file with %ld keys!\n", load_keys);
+    COUT_THIS("Total line count: " << linecount);
+    return 0;
+}
@@ -1,5 +1,5 @@
 import sys
-import os
+import subprocess
 
 if len(sys.argv) < 4:
     print(f"Usage: {sys.argv[0]} [cluster_number] [input_filepath] [output_dir]")
@@ -12,17 +12,9 @@ output_dir = sys.argv[3]
 TABLE_SIZE = 10_000_000
 THREAD_NUMBER = 16
 
-# 0. Make
-os.system(f'make -C twitter_cache_trace')
+# 0. Make (only when the tools are out of date)
+if subprocess.run(["make", "-q", "-C", "twitter_cache_trace"]).returncode != 0:
+    subprocess.run(["make", "-C", "twitter_cache_trace"], check=True)
 
-# 1. reformatting
-os.system(f'./twitter_cache_trace/reformat {input_filename} ./reformatted_{cluster_number}')
-
-# 2. make_load_trace
-os.system(f'./twitter_cache_trace/make_load_trace ./reformatted_{cluster_number} {output_dir}/{cluster_number}/load{cluster_number} {TABLE_SIZE}')
-
-# 3. split_workload_trace
-os.system(f'./twitter_cache_Trace/split_workload_trace ./reformatted_{cluster_number} {output_dir}/{cluster_number} {THREAD_NUMBER}')
-
-# 4. cleanup
-os.system(f'rm -f ./reformatted_{cluster_number}')
\ No newline at end of file
+# 1. reformat, make load trace and split workload trace in a single pass
+subprocess.run(["./twitter_cache_trace/reformat_split_load", input_filename, output_dir, cluster_number, str(TABLE_SIZE), str(THREAD_NUMBER)], check=True)
\ No newline at end of file
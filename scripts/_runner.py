@@ -0,0 +1,81 @@
+import glob
+import mmap
+import os
+import re
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A complete result file ends with the last "[micro] ... latency:" line of the benchmark
+COMPLETION_PATTERN = re.compile(rb"\[micro\] [^\n]*[Ll]atency:[ \t]*\S+\s*\Z")
+TAIL_SIZE = 4096
+
+def is_complete(output: str) -> bool:
+    if not os.path.exists(output): return False
+    size = os.path.getsize(output)
+    if size == 0: return False
+    with open(output, 'rb') as f:
+        f.seek(max(0, size - TAIL_SIZE))
+        tail = f.read()
+    return COMPLETION_PATTERN.search(tail) is not None
+
+# Run an experiment unless its result file is already complete
+# Missing, empty or truncated result files are rerun
+def run_config(name: str, command: List[str], output: str, force: bool = False) -> None:
+    if not force and is_complete(output):
+        print(f"{name} (skipped, {output} is complete)")
+        return
+    print(name)
+    try:
+        with open(output, "w") as f:
+            subprocess.run(command, stdout=f, check=False)
+    except OSError as e:
+        print(f"{name}: {e}")
+
+# Run experiments, parallel_runs of them at a time, and return {output: parse(output)}
+# Concurrent experiments share the host, use parallel_runs=1 to measure each in isolation
+# Each result is parsed from the pool as soon as its experiment finishes (or is skipped)
+def run_experiments(experiments: List[Tuple[str, List[str], str]], parallel_runs: int, force: bool = False,
+                    parse: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+    results = {}
+    parse_errors = []
+
+    def on_done(future: Future, output: str) -> None:
+        if parse is None or future.exception() is not None: return
+        try:
+            results[output] = parse(output)
+        except Exception as e:
+            parse_errors.append(e)
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=parallel_runs) as executor:
+        for name, command, output in experiments:
+            future = executor.submit(run_config, name, command, output, force)
+            future.add_done_callback(lambda future, output=output: on_done(future, output))
+            futures.append(future)
+    # Raise the unexpected errors of the experiments, then those of parsing their results
+    for future in futures:
+        future.result()
+    if parse_errors:
+        raise parse_errors[0]
+    return results
+
+# Parse the last value following marker in a result file, 0 when it is missing
+def extract_value(mm: mmap.mmap, marker: bytes) -> float:
+    pos = mm.rfind(marker)
+    if pos == -1: return 0.0
+    end = mm.find(b"\n", pos)
+    return float(mm[pos:end if end != -1 else len(mm)].split()[-1])
+
+# Parse the [throughput, latency] of a result file, zeros when they are missing
+def extract_throughput_n_latency(filename: str) -> List[float]:
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0: return [0.0, 0.0]
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [extract_value(mm, b"[micro] Throughput(op/s):"), extract_value(mm, b"[micro] Latency:")]
+
+# Remove the result files with the results Makefile, only when there is something to remove
+# (its "all" target is phony, so "make -q" would always report it out of date)
+def cleanup_results(results_dir: str) -> None:
+    if glob.glob(os.path.join(results_dir, "*.txt")):
+        subprocess.run(["make", "-C", results_dir], check=False)
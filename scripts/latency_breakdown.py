@@ -1,13 +1,20 @@
 import csv
 import os
+import re
 from typing import List
 from math import isnan
 
+from _runner import cleanup_results, run_experiments
+
 # Configurations
 INDEX_LIST=("original",)
 RUNTIME=30
 REPEAT_NUM=1
 FG_THREADS=16
+BUILD_DIR="../build"
+RESULTS_DIR="../results"
+PARALLEL_RUNS=1 # Experiments run at once, more share cores, memory bandwidth, LLC and RAM and skew the measurements
+FORCE_RERUN=False # Rerun experiments whose result file is already complete
 
 YCSB_DATASET_LIST=("amazon", "memetracker")
 YCSB_KEY_LIST=(12, 128)
@@ -15,57 +22,49 @@ YCSB_WORKLOAD_LIST=("D", "E")
 TWITTER_TRACE_NUMBER_LIST=("12.2", "15.5", "31.1", "37.3")
 TWITTER_KEY_LIST=(44, 19, 47, 82)
 
+experiments = []
+result_files = {} # Result file of each configuration, used by both the run and parse phases
+
 # Run YCSB
 for i in range(REPEAT_NUM):
     for index in INDEX_LIST:
         for dataset, key_len in zip(YCSB_DATASET_LIST, YCSB_KEY_LIST):
             for workload in YCSB_WORKLOAD_LIST:
-                print(f"{index}_{dataset}_{workload}_{i}")
-                os.system(f'../build/LATENCY_BREAKDOWN_{index}_ycsb_{key_len} \
-                                --fg={FG_THREADS}           \
-                                --runtime={RUNTIME}         \
-                                --dataset-name={dataset}    \
-                                --workload-type={workload}  \
-                                > ../results/latency_breakdown_{index}_{dataset}_{workload}_{i}.txt')
+                result_files[index, dataset, workload, i] = os.path.join(RESULTS_DIR, f"latency_breakdown_{index}_{dataset}_{workload}_{i}.txt")
+                experiments.append((f"{index}_{dataset}_{workload}_{i}",
+                                    [os.path.join(BUILD_DIR, f"LATENCY_BREAKDOWN_{index}_ycsb_{key_len}"),
+                                     f"--fg={FG_THREADS}",
+                                     f"--runtime={RUNTIME}",
+                                     f"--dataset-name={dataset}",
+                                     f"--workload-type={workload}"],
+                                    result_files[index, dataset, workload, i]))
 
 # Run Twitter Cache Trace
 for i in range(REPEAT_NUM):
     for index in INDEX_LIST:
         for cluster, key_len in zip(TWITTER_TRACE_NUMBER_LIST, TWITTER_KEY_LIST):
-            print(f"{index}_{cluster}_{i}")
-            os.system(f'../build/LATENCY_BREAKDOWN_{index}_twitter_{key_len}  \
-                                --fg={FG_THREADS}           \
-                                --runtime={RUNTIME}         \
-                                --cluster-number={cluster}  \
-                                > ../results/latency_breakdown_{index}_{cluster}_{i}.txt')
+            result_files[index, cluster, i] = os.path.join(RESULTS_DIR, f"latency_breakdown_{index}_{cluster}_{i}.txt")
+            experiments.append((f"{index}_{cluster}_{i}",
+                                [os.path.join(BUILD_DIR, f"LATENCY_BREAKDOWN_{index}_twitter_{key_len}"),
+                                 f"--fg={FG_THREADS}",
+                                 f"--runtime={RUNTIME}",
+                                 f"--cluster-number={cluster}"],
+                                result_files[index, cluster, i]))
 
 # Parse
+BREAKDOWN_PATTERN = re.compile(rb"\[micro\] (group traverse|inference|linear search|range search|buffer search) latency:[ \t]*(\S+)")
+BREAKDOWN_LIST = (b"group traverse", b"inference", b"linear search", b"range search", b"buffer search")
+
 def extract_breakdown(filename: str) -> List[float]:
-    group_traverse = 0.0
-    inference = 0.0
-    linear_search = 0.0
-    range_search = 0.0
-    buffer_search = 0.0
-    with open(filename, 'r') as f:
-        while True:
-            line = f.readline()
-            if line == "": break
-            elif "[micro] group traverse latency:" in line:
-                splitted = line.split()
-                group_traverse = float(splitted[-1])
-            elif "[micro] inference latency:" in line:
-                splitted = line.split()
-                inference = float(splitted[-1])
-            elif "[micro] linear search latency:" in line:
-                splitted = line.split()
-                linear_search = float(splitted[-1])
-            elif "[micro] range search latency:" in line:
-                splitted = line.split()
-                range_search = float(splitted[-1])
-            elif "[micro] buffer search latency:" in line:
-                splitted = line.split()
-                buffer_search = float(splitted[-1])
-    return [group_traverse, inference, linear_search, range_search, buffer_search]
+    breakdown = dict.fromkeys(BREAKDOWN_LIST, 0.0)
+    with open(filename, 'rb') as f:
+        data = f.read()
+    for match in BREAKDOWN_PATTERN.finditer(data):
+        breakdown[match.group(1)] = float(match.group(2))
+    return [breakdown[name] for name in BREAKDOWN_LIST]
+
+# Results are parsed as soon as each experiment completes
+results = run_experiments(experiments, PARALLEL_RUNS, FORCE_RERUN, extract_breakdown)
 
 # Export
 print("Experiment Results will be exported to ./latency_breakdown_ycsb.csv")
@@ -83,7 +82,7 @@ with open('./latency_breakdown_ycsb.csv', 'w') as f:
                 valid_counter = 0
                 for i in range(REPEAT_NUM):
                     group_traverse, inference, linear_search, range_search, buffer_search \
-                        = extract_breakdown(f"../results/latency_breakdown_{index}_{dataset}_{workload}_{i}.txt")
+                        = results[result_files[index, dataset, workload, i]]
                     if group_traverse != 0.0:
                         group_traverse_sum += 0 if isnan(group_traverse) else group_traverse
                         inference_sum += 0 if isnan(inference) else inference
@@ -113,7 +112,7 @@ with open('./latency_breakdown_twitter.csv', 'w') as f:
             valid_counter = 0
             for i in range(REPEAT_NUM):
                 group_traverse, inference, linear_search, range_search, buffer_search \
-                    = extract_breakdown(f"../results/latency_breakdown_{index}_{cluster}_{i}.txt")
+                    = results[result_files[index, cluster, i]]
                 if group_traverse != 0.0:
                     group_traverse_sum += 0 if isnan(group_traverse) else group_traverse
                     inference_sum += 0 if isnan(inference) else inference
@@ -130,4 +129,4 @@ with open('./latency_breakdown_twitter.csv', 'w') as f:
             wr.writerow([index, cluster, group_traverse_avg, inference_avg, linear_search_avg, range_search_avg, buffer_search_avg])
         
 # Cleanup
-os.system(f"make -C ../results")
\ No newline at end of file
+cleanup_results(RESULTS_DIR)
\ No newline at end of file
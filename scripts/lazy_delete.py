@@ -1,12 +1,17 @@
 import csv
 import os
-from typing import List
+
+from _runner import cleanup_results, extract_throughput_n_latency, run_experiments
 
 # Configurations
 INDEX="ideal"
 RUNTIME=30
 REPEAT_NUM=1
 FG_THREADS=16
+BUILD_DIR="../build"
+RESULTS_DIR="../results"
+PARALLEL_RUNS=1 # Experiments run at once, more share cores, memory bandwidth, LLC and RAM and skew the measurements
+FORCE_RERUN=False # Rerun experiments whose result file is already complete
 
 DISTRIBUTION="UNIFORM_DIST"
 INITIAL_SIZE=10_000_000
@@ -17,36 +22,28 @@ DELETE_RATIO_LIST=(0.05, 0.10, 0.15)
 
 IDEAL_TRAINING_TIME_LIST=(5, 30, 100, 300)
 
+experiments = []
+result_files = {} # Result file of each configuration, used by both the run and parse phases
+
 # Run Microbenchmark
 for i in range(REPEAT_NUM):
     for read_ratio, delete_ratio in zip(READ_RATIO_LIST, DELETE_RATIO_LIST):
         for training_time in IDEAL_TRAINING_TIME_LIST:
-            print(f"{INDEX}_Delete:{delete_ratio}_TrainTime:{training_time}_{i}")
-            os.system(f"../build/micro_ideal_UNIFORM_DIST   \
-                        --fg={FG_THREADS}                   \
-                        --runtime={RUNTIME}                 \
-                        --read={read_ratio}                 \
-                        --remove={delete_ratio}             \
-                        --initial-size={INITIAL_SIZE}       \
-                        --target-size={TARGET_SIZE}         \
-                        --table-size={DATASET_SIZE}         \
-                        > ../results/lazy_delete_{delete_ratio}_{training_time}_{i}.txt")
+            result_files[delete_ratio, training_time, i] = os.path.join(RESULTS_DIR, f"lazy_delete_{delete_ratio}_{training_time}_{i}.txt")
+            experiments.append((f"{INDEX}_Delete:{delete_ratio}_TrainTime:{training_time}_{i}",
+                                [os.path.join(BUILD_DIR, "micro_ideal_UNIFORM_DIST"),
+                                 f"--fg={FG_THREADS}",
+                                 f"--runtime={RUNTIME}",
+                                 f"--read={read_ratio}",
+                                 f"--remove={delete_ratio}",
+                                 f"--initial-size={INITIAL_SIZE}",
+                                 f"--target-size={TARGET_SIZE}",
+                                 f"--table-size={DATASET_SIZE}"],
+                                result_files[delete_ratio, training_time, i]))
 
 # Parse
-def extract_throughput_n_latency(filename: str) -> List[float]:
-    througput = 0.0
-    latency = 0.0
-    with open(filename, 'r') as f:
-        while True:
-            line = f.readline()
-            if line == "": break
-            elif "[micro] Throughput(op/s):" in line:
-                splitted = line.split()
-                througput = float(splitted[-1])
-            elif "[micro] Latency:" in line:
-                splitted = line.split()
-                latency = float(splitted[-1])
-    return [througput, latency]
+# Results are parsed as soon as each experiment completes
+results = run_experiments(experiments, PARALLEL_RUNS, FORCE_RERUN, extract_throughput_n_latency)
 
 # Export
 print("Experiment Results will be exported to ./lazy_delete.csv")
@@ -59,7 +56,7 @@ with open("./lazy_delete.csv", "w") as f:
             latency_sum = 0.0
             valid_counter = 0
             for i in range(REPEAT_NUM):
-                throughput, latency = extract_throughput_n_latency(f"../results/lazy_delete_{delete_ratio}_{training_time}_{i}.txt")
+                throughput, latency = results[result_files[delete_ratio, training_time, i]]
                 if latency != 0.0:
                     throughput_sum += throughput
                     latency_sum += latency
@@ -69,4 +66,4 @@ with open("./lazy_delete.csv", "w") as f:
             wr.writerow([delete_ratio, training_time, throughput_avg, latency_avg])
 
 # Cleanup
-os.system(f"make -C ../results")
\ No newline at end of file
+cleanup_results(RESULTS_DIR)
\ No newline at end of file
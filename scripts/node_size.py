@@ -1,12 +1,17 @@
 import csv
 import os
-from typing import List
+
+from _runner import cleanup_results, extract_throughput_n_latency, run_experiments
 
 # Configurations
 INDEX_LIST=("original", "sia-sw",)
 RUNTIME=30
 REPEAT_NUM=1
 FG_THREADS=16
+BUILD_DIR="../build"
+RESULTS_DIR="../results"
+PARALLEL_RUNS=1 # Experiments run at once, more share cores, memory bandwidth, LLC and RAM and skew the measurements
+FORCE_RERUN=False # Rerun experiments whose result file is already complete
 
 YCSB_DATASET_LIST=("amazon", "memetracker")
 YCSB_KEY_LIST=(12, 128)
@@ -16,50 +21,42 @@ TWITTER_KEY_LIST=(44, 19, 47, 82)
 
 NODE_ACCURACY_THRESHOLD_LIST=(8, 16, 24, 32)
 
+experiments = []
+result_files = {} # Result file of each configuration, used by both the run and parse phases
+
 # Run YCSB
 for i in range(REPEAT_NUM):
     for node_accuracy in NODE_ACCURACY_THRESHOLD_LIST:
         for index in INDEX_LIST:
             for dataset, key_len in zip(YCSB_DATASET_LIST, YCSB_KEY_LIST):
                 for workload in YCSB_WORKLOAD_LIST:
-                    print(f"{index}_{dataset}_{workload}_{node_accuracy}_{i}")
-                    os.system(f'../build/PERFORMANCE_{index}_ycsb_{key_len}     \
-                                    --fg={FG_THREADS}                           \
-                                    --runtime={RUNTIME}                         \
-                                    --dataset-name={dataset}                    \
-                                    --workload-type={workload}                  \
-                                    --sindex-group-err-bound={node_accuracy}    \
-                                    --sindex-root-err-bound={node_accuracy}     \
-                                    > ../results/node_size_{index}_{dataset}_{workload}_{node_accuracy}_{i}.txt')
+                    result_files[index, dataset, workload, node_accuracy, i] = os.path.join(RESULTS_DIR, f"node_size_{index}_{dataset}_{workload}_{node_accuracy}_{i}.txt")
+                    experiments.append((f"{index}_{dataset}_{workload}_{node_accuracy}_{i}",
+                                        [os.path.join(BUILD_DIR, f"PERFORMANCE_{index}_ycsb_{key_len}"),
+                                         f"--fg={FG_THREADS}",
+                                         f"--runtime={RUNTIME}",
+                                         f"--dataset-name={dataset}",
+                                         f"--workload-type={workload}",
+                                         f"--sindex-group-err-bound={node_accuracy}",
+                                         f"--sindex-root-err-bound={node_accuracy}"],
+                                        result_files[index, dataset, workload, node_accuracy, i]))
 
 # Run Twitter Cache Trace
 for i in range(REPEAT_NUM):
     for node_accuracy in NODE_ACCURACY_THRESHOLD_LIST:
         for index in INDEX_LIST:
             for cluster, key_len in zip(TWITTER_TRACE_NUMBER_LIST, TWITTER_KEY_LIST):
-                print(f"{index}_{cluster}_{node_accuracy}_{i}")
-                os.system(f'../build/PERFORMANCE_{index}_twitter_{key_len}  \
-                                    --fg={FG_THREADS}           \
-                                    --runtime={RUNTIME}         \
-                                    --cluster-number={cluster}  \
-                                    > ../results/node_size_{index}_{cluster}_{node_accuracy}_{i}.txt')
-
+                result_files[index, cluster, node_accuracy, i] = os.path.join(RESULTS_DIR, f"node_size_{index}_{cluster}_{node_accuracy}_{i}.txt")
+                experiments.append((f"{index}_{cluster}_{node_accuracy}_{i}",
+                                    [os.path.join(BUILD_DIR, f"PERFORMANCE_{index}_twitter_{key_len}"),
+                                     f"--fg={FG_THREADS}",
+                                     f"--runtime={RUNTIME}",
+                                     f"--cluster-number={cluster}"],
+                                    result_files[index, cluster, node_accuracy, i]))
 
 # Parse
-def extract_throughput_n_latency(filename: str) -> List[float]:
-    througput = 0.0
-    latency = 0.0
-    with open(filename, 'r') as f:
-        while True:
-            line = f.readline()
-            if line == "": break
-            elif "[micro] Throughput(op/s):" in line:
-                splitted = line.split()
-                througput = float(splitted[-1])
-            elif "[micro] Latency:" in line:
-                splitted = line.split()
-                latency = float(splitted[-1])
-    return [througput, latency]
+# Results are parsed as soon as each experiment completes
+results = run_experiments(experiments, PARALLEL_RUNS, FORCE_RERUN, extract_throughput_n_latency)
 
 # Export
 print("Experiment Results will be exported to ./node_size_ycsb.csv")
@@ -74,7 +71,7 @@ with open('./node_size_ycsb.csv', 'w') as f:
                     latency_sum = 0.0
                     valid_counter = 0
                     for i in range(REPEAT_NUM):
-                        throughput, latency = extract_throughput_n_latency(f"../results/node_size_{index}_{dataset}_{workload}_{node_accuracy}_{i}.txt")
+                        throughput, latency = results[result_files[index, dataset, workload, node_accuracy, i]]
                         if latency != 0.0:
                             throughput_sum += throughput
                             latency_sum += latency
@@ -94,7 +91,7 @@ with open('./node_size_twitter.csv', 'w') as f:
                 latency_sum = 0.0
                 valid_counter = 0
                 for i in range(REPEAT_NUM):
-                    throughput, latency = extract_throughput_n_latency(f"../results/node_size_{index}_{cluster}_{node_accuracy}_{i}.txt")
+                    throughput, latency = results[result_files[index, cluster, node_accuracy, i]]
                     if latency != 0.0:
                         throughput_sum += throughput
                         latency_sum += latency
@@ -104,4 +101,4 @@ with open('./node_size_twitter.csv', 'w') as f:
                 wr.writerow([index, cluster, node_accuracy, throughput_avg, latency_avg])
 
 # Cleanup
-os.system(f"make -C ../results")
\ No newline at end of file
+cleanup_results(RESULTS_DIR)
\ No newline at end of file
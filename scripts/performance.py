@@ -1,12 +1,17 @@
 import csv
 import os
-from typing import List
+
+from _runner import cleanup_results, extract_throughput_n_latency, run_experiments
 
 # Configurations
 INDEX_LIST=("original", "sia-sw", "ideal", "cuckoo", "wormhole", "alex")
 RUNTIME=30
 REPEAT_NUM=1
 FG_THREADS=16
+BUILD_DIR="../build"
+RESULTS_DIR="../results"
+PARALLEL_RUNS=1 # Experiments run at once, more share cores, memory bandwidth, LLC and RAM and skew the measurements
+FORCE_RERUN=False # Rerun experiments whose result file is already complete
 
 YCSB_DATASET_LIST=("amazon", "memetracker")
 YCSB_KEY_LIST=(12, 128)
@@ -17,67 +22,62 @@ TWITTER_KEY_LIST=(44, 19, 47, 82)
 YCSB_ALEX_HYPERPARAM=((128, 63), (512, 63))
 TWITTER_ALEX_HYPERPARAM=((500, 512), (1500, 256), (1500, 256), (5000, 64))
 
+experiments = []
+result_files = {} # Result file of each configuration, used by both the run and parse phases
+
 # Run YCSB
 for i in range(REPEAT_NUM):
     for index in INDEX_LIST:
         for dataset, key_len, alex_entry in zip(YCSB_DATASET_LIST, YCSB_KEY_LIST, YCSB_ALEX_HYPERPARAM):
             for workload in YCSB_WORKLOAD_LIST:
-                print(f"{index}_{dataset}_{workload}_{i}")
+                result_files[index, dataset, workload, i] = os.path.join(RESULTS_DIR, f"performance_{index}_{dataset}_{workload}_{i}.txt")
                 if index != "alex":
-                    os.system(f'../build/PERFORMANCE_{index}_ycsb_{key_len} \
-                                    --fg={FG_THREADS}           \
-                                    --runtime={RUNTIME}         \
-                                    --dataset-name={dataset}    \
-                                    --workload-type={workload}  \
-                                    > ../results/performance_{index}_{dataset}_{workload}_{i}.txt')
+                    experiments.append((f"{index}_{dataset}_{workload}_{i}",
+                                        [os.path.join(BUILD_DIR, f"PERFORMANCE_{index}_ycsb_{key_len}"),
+                                         f"--fg={FG_THREADS}",
+                                         f"--runtime={RUNTIME}",
+                                         f"--dataset-name={dataset}",
+                                         f"--workload-type={workload}"],
+                                        result_files[index, dataset, workload, i]))
                 else:
-                    os.system(f'../build/PERFORMANCE_{index}_ycsb       \
-                                    --fg={FG_THREADS}                   \
-                                    --runtime={RUNTIME}                 \
-                                    --dataset-name={dataset}            \
-                                    --workload-type={workload}          \
-                                    --key-length={key_len}              \
-                                    --node-size={alex_entry[0]}         \
-                                    --delta-idx-size={alex_entry[1]}    \
-                                    > ../results/performance_{index}_{dataset}_{workload}_{i}.txt')
+                    experiments.append((f"{index}_{dataset}_{workload}_{i}",
+                                        [os.path.join(BUILD_DIR, f"PERFORMANCE_{index}_ycsb"),
+                                         f"--fg={FG_THREADS}",
+                                         f"--runtime={RUNTIME}",
+                                         f"--dataset-name={dataset}",
+                                         f"--workload-type={workload}",
+                                         f"--key-length={key_len}",
+                                         f"--node-size={alex_entry[0]}",
+                                         f"--delta-idx-size={alex_entry[1]}"],
+                                        result_files[index, dataset, workload, i]))
 
 
 # Run Twitter Cache Trace
 for i in range(REPEAT_NUM):
     for index in INDEX_LIST:
         for cluster, key_len, alex_entry in zip(TWITTER_TRACE_NUMBER_LIST, TWITTER_KEY_LIST, TWITTER_ALEX_HYPERPARAM):
-            print(f"{index}_{cluster}_{i}")
+            result_files[index, cluster, i] = os.path.join(RESULTS_DIR, f"performance_{index}_{cluster}_{i}.txt")
             if index != "alex":
-                os.system(f'../build/PERFORMANCE_{index}_twitter_{key_len}  \
-                                    --fg={FG_THREADS}           \
-                                    --runtime={RUNTIME}         \
-                                    --cluster-number={cluster}  \
-                                    > ../results/performance_{index}_{cluster}_{i}.txt')
+                experiments.append((f"{index}_{cluster}_{i}",
+                                    [os.path.join(BUILD_DIR, f"PERFORMANCE_{index}_twitter_{key_len}"),
+                                     f"--fg={FG_THREADS}",
+                                     f"--runtime={RUNTIME}",
+                                     f"--cluster-number={cluster}"],
+                                    result_files[index, cluster, i]))
             else:
-                os.system(f'../build/PERFORMANCE_{index}_twitter        \
-                                    --fg={FG_THREADS}                   \
-                                    --runtime={RUNTIME}                 \
-                                    --cluster-number={cluster}          \
-                                    --key-length={key_len}              \
-                                    --node-size={alex_entry[0]}         \
-                                    --delta-idx-size={alex_entry[1]}    \
-                                    > ../results/performance_{index}_{cluster}_{i}.txt')
+                experiments.append((f"{index}_{cluster}_{i}",
+                                    [os.path.join(BUILD_DIR, f"PERFORMANCE_{index}_twitter"),
+                                     f"--fg={FG_THREADS}",
+                                     f"--runtime={RUNTIME}",
+                                     f"--cluster-number={cluster}",
+                                     f"--key-length={key_len}",
+                                     f"--node-size={alex_entry[0]}",
+                                     f"--delta-idx-size={alex_entry[1]}"],
+                                    result_files[index, cluster, i]))
 
 # Parse
-def extract_throughput_n_latency(filename: str) -> List[float]:
-    througput = 0.0
-    latency = 0.0
-    with open(filename, 'r') as f:
-        while True:
-            line = f.readline()
-            if line == "": break
-            elif "[micro] Throughput(op/s):" in line:
-                splitted = line.split()
-                througput = float(splitted[-1])
-            elif "[micro] Latency:" in line:
-                splitted = line.split()
-                latency = float(splitted[-1])
-    return [througput, latency]
+# Results are parsed as soon as each experiment completes
+results = run_experiments(experiments, PARALLEL_RUNS, FORCE_RERUN, extract_throughput_n_latency)
 
 # Export
 print("Experiment Results will be exported to ./performance_ycsb.csv")
@@ -91,7 +91,7 @@ with open('./performance_ycsb.csv', 'w') as f:
                 latency_sum = 0.0
                 valid_counter = 0
                 for i in range(REPEAT_NUM):
-                    throughput, latency = extract_throughput_n_latency(f"../results/performance_{index}_{dataset}_{workload}_{i}.txt")
+                    throughput, latency = results[result_files[index, dataset, workload, i]]
                     if latency != 0.0:
                         throughput_sum += throughput
                         latency_sum += latency
@@ -110,7 +110,7 @@ with open('./performance_twitter.csv', 'w') as f:
             latency_sum = 0.0
             valid_counter = 0
             for i in range(REPEAT_NUM):
-                throughput, latency = extract_throughput_n_latency(f"../results/performance_{index}_{cluster}_{i}.txt")
+                throughput, latency = results[result_files[index, cluster, i]]
                 if latency != 0.0:
                     throughput_sum += throughput
                     latency_sum += latency
@@ -120,4 +120,4 @@ with open('./performance_twitter.csv', 'w') as f:
             wr.writerow([index, cluster, throughput_avg, latency_avg])
 
 # Cleanup
-os.system(f"make -C ../results")
\ No newline at end of file
+cleanup_results(RESULTS_DIR)
\ No newline at end of file
@@ -1,12 +1,17 @@
 import csv
 import os
-from typing import List
+
+from _runner import cleanup_results, extract_throughput_n_latency, run_experiments
 
 # Configurations
 INDEX_LIST=("original", "sia-sw", "ideal", "cuckoo", "wormhole", "alex")
 RUNTIME=30
 REPEAT_NUM=1
 FG_THREADS=16
+BUILD_DIR="../build"
+RESULTS_DIR="../results"
+PARALLEL_RUNS=1 # Experiments run at once, more share cores, memory bandwidth, LLC and RAM and skew the measurements
+FORCE_RERUN=False # Rerun experiments whose result file is already complete
 
 DISTRIBUTION_LIST=("UNIFORM_DIST", "SEQUENTIAL_DIST", "LATEST_DIST", "EXPONENT_DIST", "ZIPF_DIST", "HOTSPOT_DIST")
 INITIAL_SIZE=10_000_000
@@ -15,50 +20,43 @@ DATASET_SIZE=100_000_000
 READ_RATIO=0.5
 INSERT_RATIO=0.5
 
+experiments = []
+result_files = {} # Result file of each configuration, used by both the run and parse phases
+
 # Run Microbenchmark
 for i in range(REPEAT_NUM):
     for index in INDEX_LIST:
         for dist in DISTRIBUTION_LIST:
-            print(f"{index}_{dist}_{i}")
+            result_files[index, dist, i] = os.path.join(RESULTS_DIR, f"request_dist_{index}_{dist}_{i}.txt")
             if index != "alex":
-                os.system(f"../build/micro_{index}_{dist}       \
-                            --fg={FG_THREADS}                   \
-                            --runtime={RUNTIME}                 \
-                            --read={READ_RATIO}                 \
-                            --insert={INSERT_RATIO}             \
-                            --initial-size={INITIAL_SIZE}       \
-                            --target-size={TARGET_SIZE}         \
-                            --table-size={DATASET_SIZE}         \
-                            > ../results/request_dist_{index}_{dist}_{i}.txt")
+                experiments.append((f"{index}_{dist}_{i}",
+                                    [os.path.join(BUILD_DIR, f"micro_{index}_{dist}"),
+                                     f"--fg={FG_THREADS}",
+                                     f"--runtime={RUNTIME}",
+                                     f"--read={READ_RATIO}",
+                                     f"--insert={INSERT_RATIO}",
+                                     f"--initial-size={INITIAL_SIZE}",
+                                     f"--target-size={TARGET_SIZE}",
+                                     f"--table-size={DATASET_SIZE}"],
+                                    result_files[index, dist, i]))
             else:
-                os.system(f"../build/micro_{index}_{dist}       \
-                            --fg={FG_THREADS}                   \
-                            --runtime={RUNTIME}                 \
-                            --read={READ_RATIO}                 \
-                            --insert={INSERT_RATIO}             \
-                            --key-length=32                     \
-                            --initial-size={INITIAL_SIZE}       \
-                            --target-size={TARGET_SIZE}         \
-                            --table-size={DATASET_SIZE}         \
-                            --node-size=8                       \
-                            --delta-idx-size=0                  \
-                            > ../results/request_dist_{index}_{dist}_{i}.txt")
+                experiments.append((f"{index}_{dist}_{i}",
+                                    [os.path.join(BUILD_DIR, f"micro_{index}_{dist}"),
+                                     f"--fg={FG_THREADS}",
+                                     f"--runtime={RUNTIME}",
+                                     f"--read={READ_RATIO}",
+                                     f"--insert={INSERT_RATIO}",
+                                     "--key-length=32",
+                                     f"--initial-size={INITIAL_SIZE}",
+                                     f"--target-size={TARGET_SIZE}",
+                                     f"--table-size={DATASET_SIZE}",
+                                     "--node-size=8",
+                                     "--delta-idx-size=0"],
+                                    result_files[index, dist, i]))
 
 # Parse
-def extract_throughput_n_latency(filename: str) -> List[float]:
-    througput = 0.0
-    latency = 0.0
-    with open(filename, 'r') as f:
-        while True:
-            line = f.readline()
-            if line == "": break
-            elif "[micro] Throughput(op/s):" in line:
-                splitted = line.split()
-                througput = float(splitted[-1])
-            elif "[micro] Latency:" in line:
-                splitted = line.split()
-                latency = float(splitted[-1])
-    return [througput, latency]
+# Results are parsed as soon as each experiment completes
+results = run_experiments(experiments, PARALLEL_RUNS, FORCE_RERUN, extract_throughput_n_latency)
 
 # Export
 print("Experiment Results will be exported to ./request_dist.csv")
@@ -71,7 +69,7 @@ with open("./request_dist.csv", "w") as f:
             latency_sum = 0.0
             valid_counter = 0
             for i in range(REPEAT_NUM):
-                throughput, latency = extract_throughput_n_latency(f"../results/request_dist_{index}_{dist}_{i}.txt")
+                throughput, latency = results[result_files[index, dist, i]]
                 if latency != 0.0:
                     throughput_sum += throughput
                     latency_sum += latency
@@ -81,4 +79,4 @@ with open("./request_dist.csv", "w") as f:
             wr.writerow([index, dist, throughput_avg, latency_avg])
 
 # Cleanup
-os.system(f"make -C ../results")
\ No newline at end of file
+cleanup_results(RESULTS_DIR)
\ No newline at end of file
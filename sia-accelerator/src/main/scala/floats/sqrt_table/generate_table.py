@@ -1,31 +1,22 @@
 import sys
-import math
-import struct
+import numpy as np
 
-def fp2bin(num):
-    return ''.join('{:0>8b}'.format(c) for c in struct.pack('!f', num))
+FRAC_BITS = 23
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print(f"usage: {sys.argv[0]} [bits] [output_file]")
+        print(f"usage: {sys.argv[0]} [bits] [output_file] [--verbose]")
         exit(0)
 
-    binary_table = []
     num_bits = int(sys.argv[1])
+    verbose = "--verbose" in sys.argv[3:]
 
-    with open(sys.argv[2], "w") as f:
-        with open(sys.argv[2] + ".log", "w") as f_log:
-            for i in range(0, 2 ** num_bits):
-                binary_table.append(format(i, 'b').rjust(num_bits, '0'))
-            for binary in binary_table:
-                mantissa = 1
-                for i in range(0, num_bits):
-                    if binary[i] == '1':
-                        mantissa += 1 / (2 ** (i+1))
-                sqrt_num = math.sqrt(mantissa)
-                sqrt_num_bin = fp2bin(sqrt_num)
-                frac_bin = sqrt_num_bin[9:]
-                assert(len(frac_bin) == 23)
-                frac = int(frac_bin, 2)
-                f.write(f"{frac}\n")
-                f_log.write(f"before mantissa: {mantissa}, sqrt mantissa: {sqrt_num}, encoded mantissa: {sqrt_num_bin}, encoded frac: {frac_bin}, frac: {frac}\n")
+    # i-th entry: square root of the mantissa 1.b(i), where b(i) is i in num_bits bits
+    mantissa = 1.0 + np.arange(2 ** num_bits, dtype=np.float64) / (1 << num_bits)
+    sqrt_num = np.sqrt(mantissa).astype(np.float32)
+    frac = sqrt_num.view(np.uint32) & ((1 << FRAC_BITS) - 1)
+
+    np.savetxt(sys.argv[2], frac, fmt="%d")
+    if verbose:
+        np.savetxt(sys.argv[2] + ".log", np.column_stack((mantissa, sqrt_num, frac)),
+                   fmt=("%.17g", "%.9g", "%d"), header="before mantissa, sqrt mantissa, frac")